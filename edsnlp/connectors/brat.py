@@ -1,4 +1,5 @@
 import glob
+import json
 import os
 import re
 from collections import defaultdict
@@ -19,6 +20,7 @@ REGEX_RELATION = re.compile(r"^(R\d+)\t([^\s]+) Arg1:([^\s]+) Arg2:([^\s]+)")
 REGEX_ATTRIBUTE = re.compile(r"^([AM]\d+)\t(.+)$")
 REGEX_EVENT = re.compile(r"^(E\d+)\t(.+)$")
 REGEX_EVENT_PART = re.compile(r"([^\s]+):([TE]\d+)")
+REGEX_FRAGMENT = re.compile(r"(\d+)\s+(\d+)")
 
 
 class BratParsingError(ValueError):
@@ -26,7 +28,11 @@ class BratParsingError(ValueError):
         super().__init__(f"File {ann_file}, unrecognized Brat line {line}")
 
 
-def load_from_brat(path: str, merge_spaced_fragments: bool = True) -> Dict:
+def load_from_brat(
+    path: str,
+    merge_spaced_fragments: bool = True,
+    ann_filenames: Optional[List[str]] = None,
+) -> Dict:
     """
     Load a brat file
 
@@ -40,14 +46,16 @@ def load_from_brat(path: str, merge_spaced_fragments: bool = True) -> Dict:
     merge_spaced_fragments: bool
         Merge fragments of a entity that was splitted by brat because it overlapped an
         end of line
+    ann_filenames: Optional[List[str]]
+        Annotation files of the document. If left to None, they are looked up
+        next to the text file, which requires a directory listing per document
 
     Returns
     -------
     Iterator[Dict]
     """
-    ann_filenames = []
-    for filename in glob.glob(path.replace(".txt", ".a*"), recursive=True):
-        ann_filenames.append(filename)
+    if ann_filenames is None:
+        ann_filenames = glob.glob(path.replace(".txt", ".a*"), recursive=True)
 
     entities = {}
     relations = []
@@ -74,25 +82,20 @@ def load_from_brat(path: str, merge_spaced_fragments: bool = True) -> Dict:
                         match = REGEX_ENTITY.match(line)
                         if match is None:
                             raise BratParsingError(ann_file, line)
-                        ann_id = match.group(1)
-                        entity = match.group(2)
-                        span = match.group(3)
-                        mention_text = match.group(4)
+                        ann_id, entity, span, mention_text = match.groups()
+                        fragments = []
                         entities[ann_id] = {
                             "text": mention_text,
                             "entity_id": ann_id,
-                            "fragments": [],
+                            "fragments": fragments,
                             "attributes": [],
                             "comments": [],
                             "label": entity,
                         }
                         last_end = None
-                        fragment_i = 0
                         begins_ends = sorted(
-                            [
-                                (int(s.split()[0]), int(s.split()[1]))
-                                for s in span.split(";")
-                            ]
+                            (int(begin), int(end))
+                            for begin, end in REGEX_FRAGMENT.findall(span)
                         )
 
                         for begin, end in begins_ends:
@@ -105,23 +108,22 @@ def load_from_brat(path: str, merge_spaced_fragments: bool = True) -> Dict:
                                 and last_end is not None
                                 and len(text[last_end:begin].strip()) == 0
                             ):
-                                entities[ann_id]["fragments"][-1]["end"] = end
+                                fragments[-1]["end"] = end
                                 last_end = end
                                 continue
-                            entities[ann_id]["fragments"].append(
+                            fragments.append(
                                 {
                                     "begin": begin,
                                     "end": end,
                                 }
                             )
-                            fragment_i += 1
                             last_end = end
                     elif line.startswith("A") or line.startswith("M"):
                         match = REGEX_ATTRIBUTE.match(line)
                         if match is None:
                             raise BratParsingError(ann_file, line)
-                        ann_id = match.group(1)
-                        parts = match.group(2).split(" ")
+                        ann_id, attribute = match.groups()
+                        parts = attribute.split(" ")
                         if len(parts) >= 3:
                             entity, entity_id, value = parts
                         elif len(parts) == 2:
@@ -144,10 +146,7 @@ def load_from_brat(path: str, merge_spaced_fragments: bool = True) -> Dict:
                         match = REGEX_RELATION.match(line)
                         if match is None:
                             raise BratParsingError(ann_file, line)
-                        ann_id = match.group(1)
-                        ann_name = match.group(2)
-                        arg1 = match.group(3)
-                        arg2 = match.group(4)
+                        ann_id, ann_name, arg1, arg2 = match.groups()
                         relations.append(
                             {
                                 "relation_id": ann_id,
@@ -160,8 +159,7 @@ def load_from_brat(path: str, merge_spaced_fragments: bool = True) -> Dict:
                         match = REGEX_EVENT.match(line)
                         if match is None:
                             raise BratParsingError(ann_file, line)
-                        ann_id = match.group(1)
-                        arguments_txt = match.group(2)
+                        ann_id, arguments_txt = match.groups()
                         arguments = []
                         for argument in REGEX_EVENT_PART.finditer(arguments_txt):
                             arguments.append(
@@ -179,9 +177,7 @@ def load_from_brat(path: str, merge_spaced_fragments: bool = True) -> Dict:
                         match = REGEX_NOTE.match(line)
                         if match is None:
                             raise BratParsingError(ann_file, line)
-                        ann_id = match.group(1)
-                        entity_id = match.group(2)
-                        comment = match.group(3)
+                        ann_id, entity_id, comment = match.groups()
                         entities[entity_id]["comments"].append(
                             {
                                 "comment_id": ann_id,
@@ -191,7 +187,7 @@ def load_from_brat(path: str, merge_spaced_fragments: bool = True) -> Dict:
                 except Exception:
                     raise Exception(
                         "Could not parse line {} from {}: {}".format(
-                            line_idx, filename.replace(".txt", ".ann"), repr(line)
+                            line_idx, ann_file, repr(line)
                         )
                     )
     return {
@@ -215,54 +211,54 @@ def export_to_brat(doc, txt_filename, overwrite_txt=False, overwrite_ann=False):
     attribute_idx = 1
     entities_ids = defaultdict(lambda: "T" + str(len(entities_ids) + 1))
     if not os.path.exists(ann_filename) or overwrite_ann:
-        with open(ann_filename, "w") as f:
-            if "entities" in doc:
-                for entity in doc["entities"]:
-                    idx = None
-                    spans = []
-                    brat_entity_id = entities_ids[entity["entity_id"]]
-                    for fragment in sorted(
-                        entity["fragments"], key=lambda frag: frag["begin"]
-                    ):
-                        idx = fragment["begin"]
-                        entity_text = doc["text"][fragment["begin"] : fragment["end"]]
-                        for part in entity_text.split("\n"):
-                            begin = idx
-                            end = idx + len(part)
-                            idx = end + 1
-                            if begin != end:
-                                spans.append((begin, end))
-                    print(
-                        "{}\t{} {}\t{}".format(
-                            brat_entity_id,
-                            str(entity["label"]),
-                            ";".join(" ".join(map(str, span)) for span in spans),
-                            entity_text.replace("\n", " "),
-                        ),
-                        file=f,
+        # Lines are gathered and written at once, rather than printed one by one
+        lines = []
+        if "entities" in doc:
+            for entity in doc["entities"]:
+                idx = None
+                spans = []
+                brat_entity_id = entities_ids[entity["entity_id"]]
+                for fragment in sorted(
+                    entity["fragments"], key=lambda frag: frag["begin"]
+                ):
+                    idx = fragment["begin"]
+                    entity_text = doc["text"][fragment["begin"] : fragment["end"]]
+                    for part in entity_text.split("\n"):
+                        begin = idx
+                        end = idx + len(part)
+                        idx = end + 1
+                        if begin != end:
+                            spans.append((begin, end))
+                lines.append(
+                    "{}\t{} {}\t{}\n".format(
+                        brat_entity_id,
+                        str(entity["label"]),
+                        ";".join(f"{begin} {end}" for begin, end in spans),
+                        entity_text.replace("\n", " "),
                     )
-                    if "attributes" in entity:
-                        for i, attribute in enumerate(entity["attributes"]):
-                            print(
-                                "A{}\t{} {} {}".format(
-                                    attribute_idx,
-                                    str(attribute["label"]),
-                                    brat_entity_id,
-                                    attribute["value"],
-                                ),
-                                file=f,
+                )
+                if "attributes" in entity:
+                    for i, attribute in enumerate(entity["attributes"]):
+                        lines.append(
+                            "A{}\t{} {} {}\n".format(
+                                attribute_idx,
+                                str(attribute["label"]),
+                                brat_entity_id,
+                                attribute["value"],
                             )
-                            attribute_idx += 1
-            # if "relations" in doc:
-            #     for i, relation in enumerate(doc["relations"]):
-            #         entity_from = entities_ids[relation["from_entity_id"]]
-            #         entity_to = entities_ids[relation["to_entity_id"]]
-            #         print(
-            #             "R{}\t{} Arg1:{} Arg2:{}\t".format(
-            #                 i + 1, str(relation["label"]), entity_from, entity_to
-            #             ),
-            #             file=f,
-            #         )
+                        )
+                        attribute_idx += 1
+        # if "relations" in doc:
+        #     for i, relation in enumerate(doc["relations"]):
+        #         entity_from = entities_ids[relation["from_entity_id"]]
+        #         entity_to = entities_ids[relation["to_entity_id"]]
+        #         lines.append(
+        #             "R{}\t{} Arg1:{} Arg2:{}\t\n".format(
+        #                 i + 1, str(relation["label"]), entity_from, entity_to
+        #             )
+        #         )
+        with open(ann_filename, "w") as f:
+            f.write("".join(lines))
 
 
 class BratConnector(object):
@@ -332,8 +328,18 @@ class BratConnector(object):
             f"The BRAT directory contains {len(filenames)} annotated documents."
         )
 
+        # List the annotation files once, instead of once per document
+        ann_filenames = defaultdict(list)
+        for filename in glob.iglob(str(self.directory / "**" / "*.a*"), recursive=True):
+            stem, ext = filename.rsplit(".", 1)
+            if ext.startswith("a"):
+                ann_filenames[stem].append(filename)
+
         def load_and_rename(filename):
-            res = load_from_brat(filename)
+            res = load_from_brat(
+                filename,
+                ann_filenames=ann_filenames.get(filename.rsplit(".", 1)[0], []),
+            )
             res["note_id"] = str(Path(filename).relative_to(self.directory)).rsplit(
                 ".", 1
             )[0]
@@ -368,7 +374,9 @@ class BratConnector(object):
 
         annotations = self.load_brat()
 
-        texts = [doc["text"] for doc in annotations]
+        # Texts are streamed to the pipeline, and each doc is annotated as soon
+        # as it is produced
+        texts = (doc["text"] for doc in annotations)
 
         docs = []
 
@@ -377,12 +385,19 @@ class BratConnector(object):
         else:
             gold_docs = (nlp.make_doc(t) for t in texts)
 
+        # Extensions only need to be declared once: when the mapping is inferred,
+        # the attributes of the first document are declared while reading it
+        if self.attr_map is not None:
+            for dst in self.attr_map.values():
+                if not Span.has_extension(dst):
+                    Span.set_extension(dst, default=None)
+
         for doc, doc_annotations in tqdm(
             zip(gold_docs, annotations),
             ascii=True,
             ncols=100,
             desc="spaCy conversion",
-            total=len(texts),
+            total=len(annotations),
         ):
 
             doc._.note_id = doc_annotations["note_id"]
@@ -390,11 +405,6 @@ class BratConnector(object):
             spans = []
             span_groups = defaultdict(lambda: [])
 
-            if self.attr_map is not None:
-                for dst in self.attr_map.values():
-                    if not Span.has_extension(dst):
-                        Span.set_extension(dst, default=None)
-
             encountered_attributes = set()
             for ent in doc_annotations["entities"]:
                 if self.attr_map is None:
@@ -403,25 +413,36 @@ class BratConnector(object):
                             Span.set_extension(a["label"], default=None)
                         encountered_attributes.add(a["label"])
 
+                # Resolve the attribute names once for all the fragments
+                attributes = [
+                    (
+                        (
+                            a["label"]
+                            if self.attr_map is None
+                            else self.attr_map[a["label"]]
+                        ),
+                        a["value"] if a is not None else True,
+                    )
+                    for a in ent["attributes"]
+                    if self.attr_map is None or a["label"] in self.attr_map
+                ]
+
+                label = ent["label"]
+                in_span_groups = self.span_groups is None or label in self.span_groups
+
                 for fragment in ent["fragments"]:
                     span = doc.char_span(
                         fragment["begin"],
                         fragment["end"],
-                        label=ent["label"],
+                        label=label,
                         alignment_mode="expand",
                     )
-                    for a in ent["attributes"]:
-                        if self.attr_map is None or a["label"] in self.attr_map:
-                            new_name = (
-                                a["label"]
-                                if self.attr_map is None
-                                else self.attr_map[a["label"]]
-                            )
-                            span._.set(new_name, a["value"] if a is not None else True)
+                    for name, value in attributes:
+                        span._.set(name, value)
                     spans.append(span)
 
-                    if self.span_groups is None or ent["label"] in self.span_groups:
-                        span_groups[ent["label"]].append(span)
+                    if in_span_groups:
+                        span_groups[label].append(span)
 
             if self.attr_map is None:
                 self.attr_map = {k: k for k in encountered_attributes}
@@ -448,13 +469,29 @@ class BratConnector(object):
         """
         filename = str(doc._.note_id)
 
-        if self.attr_map is None:
-            rattr_map = {}
-        else:
-            rattr_map = {v: k for k, v in self.attr_map.items()}
+        spans = sorted(
+            {
+                *doc.ents,
+                *(
+                    span
+                    for name in doc.spans
+                    if self.span_groups is None or name in self.span_groups
+                    for span in doc.spans[name]
+                ),
+            }
+        )
+
+        annotations = {"text": doc.text}
 
-        annotations = {
-            "entities": [
+        # Documents without entities get an empty annotation file: skip building
+        # the attribute mapping and the entity records altogether
+        if spans:
+            if self.attr_map is None:
+                rattr_map = {}
+            else:
+                rattr_map = {v: k for k, v in self.attr_map.items()}
+
+            annotations["entities"] = [
                 {
                     "entity_id": i,
                     "fragments": [
@@ -464,28 +501,15 @@ class BratConnector(object):
                         }
                     ],
                     "attributes": [
-                        {"label": rattr_map[a], "value": getattr(ent._, a)}
-                        for a in rattr_map
-                        if getattr(ent._, a) is not None
+                        {"label": rattr_map[a], "value": value}
+                        for a, value in ((a, ent._.get(a)) for a in rattr_map)
+                        if value is not None
                     ],
                     "label": ent.label_,
                 }
-                for i, ent in enumerate(
-                    sorted(
-                        {
-                            *doc.ents,
-                            *(
-                                span
-                                for name in doc.spans
-                                if self.span_groups is None or name in self.span_groups
-                                for span in doc.spans[name]
-                            ),
-                        }
-                    )
-                )
-            ],
-            "text": doc.text,
-        }
+                for i, ent in enumerate(spans)
+            ]
+
         export_to_brat(
             annotations,
             self.full_path(f"{filename}.txt"),
@@ -505,11 +529,22 @@ class BratConnector(object):
         for doc in docs:
             self.doc2brat(doc)
 
-    def get_brat(self) -> Tuple[pd.DataFrame, pd.DataFrame]:
+    def get_brat(
+        self,
+        cache_path: Optional[Union[str, Path]] = None,
+    ) -> Tuple[pd.DataFrame, pd.DataFrame]:
         """
         Reads texts and annotations, and returns two DataFrame objects.
         For backward compatibility
 
+        Parameters
+        ----------
+        cache_path: Optional[Union[str, Path]]
+            Optional directory in which the DataFrames are cached as Parquet files
+            (requires `pyarrow`). The cache is only reused if it was built from the
+            same BRAT directory, and no file of this directory has been modified
+            since it was parsed.
+
         Returns
         -------
         texts:
@@ -518,32 +553,91 @@ class BratConnector(object):
             A DataFrame containing the annotations.
         """
 
+        if cache_path is not None:
+            cache_path = Path(cache_path)
+            texts_path = cache_path / "texts.parquet"
+            annotations_path = cache_path / "annotations.parquet"
+            metadata_path = cache_path / "metadata.json"
+            os.makedirs(cache_path, exist_ok=True)
+            # The cache is tied to the directory it was built from, and to its state
+            # when it was parsed: any later modification changes the timestamp
+            metadata = {
+                "directory": str(self.directory.resolve()),
+                "last_modified": self._last_modified(exclude=cache_path),
+            }
+            if (
+                texts_path.exists()
+                and annotations_path.exists()
+                and metadata_path.exists()
+            ):
+                with open(metadata_path) as f:
+                    if json.load(f) == metadata:
+                        return (
+                            pd.read_parquet(texts_path),
+                            pd.read_parquet(annotations_path),
+                        )
+
         brat = self.load_brat()
 
         texts = pd.DataFrame(
-            [
-                {
-                    "note_id": doc["note_id"],
-                    "note_text": doc["text"],
-                }
-                for doc in brat
-            ]
+            {
+                "note_id": [doc["note_id"] for doc in brat],
+                "note_text": [doc["text"] for doc in brat],
+            }
         )
 
-        annotations = pd.DataFrame(
-            [
-                {
-                    "note_id": doc["note_id"],
-                    "index": i,
-                    "begin": f["begin"],
-                    "end": f["end"],
-                    "label": e["label"],
-                    "lexical_variant": e["text"],
-                }
-                for doc in brat
-                for i, e in enumerate(doc["entities"])
-                for f in e["fragments"]
-            ]
-        )
+        # Build the annotation columns in a single sweep, and the DataFrame once
+        columns = {
+            "note_id": [],
+            "index": [],
+            "begin": [],
+            "end": [],
+            "label": [],
+            "lexical_variant": [],
+        }
+        for doc in brat:
+            for i, e in enumerate(doc.get("entities", ())):
+                for f in e["fragments"]:
+                    columns["note_id"].append(doc["note_id"])
+                    columns["index"].append(i)
+                    columns["begin"].append(f["begin"])
+                    columns["end"].append(f["end"])
+                    columns["label"].append(e["label"])
+                    columns["lexical_variant"].append(e["text"])
+
+        annotations = pd.DataFrame(columns)
+
+        if cache_path is not None:
+            texts.to_parquet(texts_path)
+            annotations.to_parquet(annotations_path)
+            # Written last, so that an interrupted write leaves no valid cache
+            with open(metadata_path, "w") as f:
+                json.dump(metadata, f)
 
         return texts, annotations
+
+    def _last_modified(self, exclude: Optional[Union[str, Path]] = None) -> float:
+        """
+        Returns the last modification time of the BRAT directory, ie the most
+        recent modification time of the directory, its subdirectories and its files.
+
+        Parameters
+        ----------
+        exclude: Optional[Union[str, Path]]
+            Optional path whose content is ignored
+
+        Returns
+        -------
+        float
+            A timestamp, as returned by `os.path.getmtime`
+        """
+        exclude = None if exclude is None else Path(exclude).resolve()
+        last_modified = os.path.getmtime(self.directory)
+        for path in glob.iglob(str(self.directory / "**"), recursive=True):
+            resolved = Path(path).resolve()
+            if exclude is not None and (
+                resolved == exclude or exclude in resolved.parents
+            ):
+                continue
+            last_modified = max(last_modified, os.path.getmtime(path))
+        return last_modified
@@ -40,6 +40,25 @@ class PytorchWrapperModule(torch.nn.Module):
         super().__init__()
 
         self.cfg = {"n_labels": n_labels, "input_size": input_size}
+        self.torch_compile = False
+        self._compiled_call = None
+
+    def __call__(self, *args, **kwargs):
+        """
+        Runs the module, through a `torch.compile`'d version of its call if
+        `torch_compile` is set. The compiled function is created lazily for each
+        instance, and is never copied or pickled along with the module.
+        """
+        if not self.torch_compile:
+            return super().__call__(*args, **kwargs)
+        if self._compiled_call is None:
+            self._compiled_call = torch.compile(super().__call__, dynamic=False)
+        return self._compiled_call(*args, **kwargs)
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        state["_compiled_call"] = None
+        return state
 
     @property
     def n_labels(self):
@@ -175,6 +194,8 @@ def pytorch_forward(
     encoder: Model[List[Doc], List[Floats2d]] = model.get_ref("encoder")
     embeds_list, bp_embeds = encoder(docs, is_train=is_train)
     embeds = model.ops.pad(embeds_list)  # pad embeds
+    # Compute the docs' lengths once, for both the mask and the backward pass
+    lengths = [d.shape[0] for d in embeds_list]
 
     ##################################################
     # Prepare the torch nested ner crf module inputs #
@@ -187,9 +208,7 @@ def pytorch_forward(
     # Prepare token mask from docs' lengths
     torch_mask = (
         torch.arange(embeds.shape[1], device=torch_embeds.device)
-        < torch.tensor([d.shape[0] for d in embeds_list], device=torch_embeds.device)[
-            :, None
-        ]
+        < torch.tensor(lengths, device=torch_embeds.device)[:, None]
     )
 
     #################
@@ -220,8 +239,7 @@ def pytorch_forward(
         d_embeds_torch = torch_backprop(d_loss_torch)
         d_embeds = get_d_embeds(d_embeds_torch)
         d_embeds_list = [
-            d_padded_row[: len(d_item)]
-            for d_item, d_padded_row in zip(embeds_list, d_embeds)
+            d_padded_row[:length] for length, d_padded_row in zip(lengths, d_embeds)
         ]
         d_docs = bp_embeds(d_embeds_list)
         return d_docs
@@ -254,7 +272,13 @@ def instance_init(model: Model, X: List[Doc] = None, Y: Ints2d = None) -> Model:
     pt_model = model.attrs["pt_model"]
     pt_model.cfg["input_size"] = encoder.get_dim("nO")
     pt_model.initialize()
-    pt_model.to(get_torch_default_device())
+    device = get_torch_default_device()
+    if model.attrs["mixed_precision"] and device.type != "cuda":
+        raise ValueError(
+            "Mixed precision training requires the model to run on a CUDA device, "
+            f"but the current device is {device}."
+        )
+    pt_model.to(device)
     model.set_dim("nI", pt_model.input_size)
 
     return model
@@ -264,6 +288,8 @@ def instance_init(model: Model, X: List[Doc] = None, Y: Ints2d = None) -> Model:
 def wrap_pytorch_model(
     pt_model: PytorchWrapperModule,
     encoder: Model[List[Doc], List[Floats2d]],
+    mixed_precision: bool = False,
+    torch_compile: bool = False,
 ) -> Model[
     Tuple[Iterable[Doc], Optional[PredT], Any, Any, Any, Optional[bool]],
     Tuple[Floats1d, PredT],
@@ -275,6 +301,8 @@ def wrap_pytorch_model(
 def wrap_pytorch_model(
     pt_model: PytorchWrapperModule,
     encoder: Model[List[Doc], List[Floats2d]],
+    mixed_precision: bool = False,
+    torch_compile: bool = False,
 ) -> Model[
     Tuple[Iterable[Doc], Optional[PredT], Any, Any, Optional[bool]],
     Tuple[Floats1d, PredT],
@@ -286,6 +314,8 @@ def wrap_pytorch_model(
 def wrap_pytorch_model(
     pt_model: PytorchWrapperModule,
     encoder: Model[List[Doc], List[Floats2d]],
+    mixed_precision: bool = False,
+    torch_compile: bool = False,
 ) -> Model[
     Tuple[Iterable[Doc], Optional[PredT], Any, Optional[bool]],
     Tuple[Floats1d, PredT],
@@ -296,6 +326,8 @@ def wrap_pytorch_model(
 def wrap_pytorch_model(
     encoder: Model[List[Doc], List[Floats2d]],
     pt_model: PytorchWrapperModule,
+    mixed_precision: bool = False,
+    torch_compile: bool = False,
 ) -> Model[
     Tuple[Iterable[Doc], Optional[PredT], Optional[bool]],
     Tuple[Floats1d, PredT],
@@ -311,6 +343,15 @@ def wrap_pytorch_model(
         The Thinc document token embedding layer
     pt_model: PytorchWrapperModule
         The Pytorch model
+    mixed_precision: bool
+        Whether to run the Pytorch model forward pass under autocast, with gradient
+        scaling (defaults to False). Requires the model to run on a CUDA device:
+        initializing the model on another device raises a ValueError.
+    torch_compile: bool
+        Whether to compile the Pytorch model forward pass with `torch.compile`
+        (requires torch>=2.0, defaults to False). The module is compiled on its
+        first call, for static shapes: each new batch shape triggers a
+        recompilation, so this mostly pays off when batch shapes repeat.
 
     Returns
     -------
@@ -319,15 +360,21 @@ def wrap_pytorch_model(
         Tuple[Floats1d, PredT],
         # outputs (loss, *additional_outputs)
     """
+    if torch_compile:
+        if not hasattr(torch, "compile"):
+            raise ImportError("`torch_compile=True` requires torch>=2.0")
+        pt_model.torch_compile = True
+
     return Model(
         "pytorch",
         pytorch_forward,
         attrs={
             "set_n_labels": pt_model.set_n_labels,
             "pt_model": pt_model,
+            "mixed_precision": mixed_precision,
         },
         layers=[encoder],
-        shims=[PyTorchShim(pt_model)],
+        shims=[PyTorchShim(pt_model, mixed_precision=mixed_precision)],
         refs={"encoder": encoder},
         dims={"nI": None, "nO": None},
         init=instance_init,
@@ -2,7 +2,6 @@ from enum import Enum
 from typing import Any, Dict, Iterable, List, Optional, Tuple
 
 import torch
-from loguru import logger
 from spacy import registry
 from spacy.tokens import Doc
 from thinc.model import Model
@@ -101,7 +100,9 @@ class StackedCRFNERModule(PytorchWrapperModule):
             Additional outputs that should not / cannot be back-propped through
             (Thinc treats Pytorch models solely as derivable functions, but the CRF
             that we employ performs the best tag decoding function with Pytorch)
-            This dict will contain the predicted 2d tensor of spans
+            This dict will contain the predicted 2d tensor of spans, and during
+            training, whether the batch was skipped for containing impossible
+            transitions
         is_train: bool=False
             Are we training the model (defaults to True)
         is_predict: bool=False
@@ -113,7 +114,8 @@ class StackedCRFNERModule(PytorchWrapperModule):
             Optional 0d loss (shape = [1]) to train the model
         """
         n_samples, n_tokens = embeds.shape[:2]
-        logits = self.classifier(embeds)
+        # The CRF is run in full precision, even if the forward runs under autocast
+        logits = self.classifier(embeds).float()
         crf_logits = flatten_dim(
             logits.view(n_samples, n_tokens, self.n_labels, self.crf.num_tags).permute(
                 0, 2, 1, 3
@@ -156,12 +158,12 @@ class StackedCRFNERModule(PytorchWrapperModule):
                     .logsumexp(-1)[crf_mask]
                     .sum()
                 )
-            if (loss > -IMPOSSIBLE).any():
-                logger.warning(
-                    "You likely have an impossible transition in your "
-                    "training data NER tags, skipping this batch."
-                )
-                loss = torch.zeros(1, dtype=torch.float, device=embeds.device)
+            # Skip batches with impossible transitions without leaving the device:
+            # reading the check here would synchronize with the host at each step.
+            # The pipe fetches the flag in the same device-to-host copy as the loss.
+            impossible_transitions = (loss > -IMPOSSIBLE).any()
+            loss = loss.masked_fill(impossible_transitions, 0.0)
+            additional_outputs["impossible_transitions"] = impossible_transitions.int()
             loss = loss.sum().unsqueeze(0) / 100.0
         if is_predict:
             pred_tags = self.crf.decode(crf_logits, crf_mask).reshape(
@@ -177,6 +179,8 @@ def create_model(
     tok2vec: Model[List[Doc], List[Floats2d]],
     mode: CRFMode,
     n_labels: int = None,
+    mixed_precision: bool = False,
+    torch_compile: bool = False,
 ) -> Model[
     Tuple[Iterable[Doc], Optional[Ints2d], Optional[bool]],
     Tuple[Floats1d, Ints2d],
@@ -188,4 +192,6 @@ def create_model(
             n_labels=n_labels,  # will likely be set later during initialization
             mode=mode,
         ),
+        mixed_precision=mixed_precision,
+        torch_compile=torch_compile,
     )
@@ -3,6 +3,7 @@ from itertools import islice
 from typing import Callable, Dict, Iterable, List, Mapping, Optional, Tuple
 
 import spacy
+from loguru import logger
 from spacy import Language
 from spacy.pipeline import TrainablePipe
 from spacy.tokens import Doc, Span
@@ -203,12 +204,24 @@ class TrainableNer(TrainablePipe):
         )
 
         self.scorer = scorer
+        self._label_vocab: Optional[Tuple[Tuple[str], Dict[int, int]]] = None
 
     @property
     def labels(self) -> Tuple[str]:
         """Return the labels currently added to the component."""
         return self.cfg["labels"]
 
+    @property
+    def label_vocab(self) -> Dict[int, int]:
+        """Return the label hash to label index mapping, cached until labels change"""
+        labels = self.labels
+        if self._label_vocab is None or self._label_vocab[0] is not labels:
+            self._label_vocab = (
+                labels,
+                {self.vocab.strings[l]: i for i, l in enumerate(labels)},
+            )
+        return self._label_vocab[1]
+
     @property
     def spans_labels(self) -> Dict[str, Tuple[str]]:
         """Return the span group to labels filters mapping"""
@@ -253,21 +266,39 @@ class TrainableNer(TrainablePipe):
             Spans predictions, as returned by the model's predict method
         """
         docs = list(docs)
-        new_doc_spans: List[List[Span]] = [[] for _ in docs]
-        for doc_idx, label_idx, begin, end in np_ops.asarray(predictions.get("spans")):
-            label = self.labels[label_idx]
-            new_doc_spans[doc_idx].append(Span(docs[doc_idx], begin, end, label))
-
-        for doc, new_spans in zip(docs, new_doc_spans):
-            # Only add a span to `doc.ents` if its label is in `self.ents_labels`
-            doc.ents = filter_spans(
-                [s for s in new_spans if s.label_ in self.ent_labels]
-            )
 
-            # Only add a span to `doc.spans[name]` if its label is in the matching
-            # `self.spans_labels[name]` list
-            for name, group_labels in self.spans_labels.items():
-                doc.spans[name] = [s for s in new_spans if s.label_ in group_labels]
+        # Only add a span to `doc.ents` if its label is in `self.ents_labels`, and
+        # to `doc.spans[name]` if its label is in the matching
+        # `self.spans_labels[name]` list: the destinations of each label are
+        # computed once, and each span is dispatched as soon as it is created
+        label_in_ents = [label in self.ent_labels for label in self.labels]
+        label_groups = [
+            [
+                name
+                for name, group_labels in self.spans_labels.items()
+                if label in group_labels
+            ]
+            for label in self.labels
+        ]
+
+        new_doc_ents: List[List[Span]] = [[] for _ in docs]
+        new_doc_spans: List[Dict[str, List[Span]]] = [
+            {name: [] for name in self.spans_labels} for _ in docs
+        ]
+        # Convert the whole (doc_idx, label_idx, begin, end) array to python ints at
+        # once instead of unpacking each of its rows into numpy scalars
+        spans = np_ops.asarray(predictions.get("spans")).tolist()
+        for doc_idx, label_idx, begin, end in spans:
+            span = Span(docs[doc_idx], begin, end, self.labels[label_idx])
+            if label_in_ents[label_idx]:
+                new_doc_ents[doc_idx].append(span)
+            for name in label_groups[label_idx]:
+                new_doc_spans[doc_idx][name].append(span)
+
+        for doc, new_ents, new_groups in zip(docs, new_doc_ents, new_doc_spans):
+            doc.ents = filter_spans(new_ents)
+            for name, group in new_groups.items():
+                doc.spans[name] = group
 
     def update(
         self,
@@ -316,7 +347,9 @@ class TrainableNer(TrainablePipe):
         (loss, predictions), backprop = self.model.begin_update(
             (docs, gold, set_annotations)
         )
-        loss, gradient = self.get_loss(examples, loss)
+        loss, gradient = self.get_loss(
+            examples, loss, predictions.pop("impossible_transitions", None)
+        )
         backprop(gradient)
         if sgd is not None:
             self.model.finish_update(sgd)
@@ -327,10 +360,25 @@ class TrainableNer(TrainablePipe):
 
         return loss
 
-    def get_loss(self, examples: Iterable[Example], loss) -> Tuple[float, float]:
+    def get_loss(
+        self, examples: Iterable[Example], loss, impossible_transitions=None
+    ) -> Tuple[float, float]:
         """Find the loss and gradient of loss for the batch of documents and
-        their predicted scores."""
-        return float(loss.item()), self.model.ops.xp.array([1])
+        their predicted scores.
+
+        The loss and the optional impossible transitions flag are fetched from the
+        device in a single copy, to synchronize only once per batch."""
+        xp = self.model.ops.xp
+        values = [loss.ravel()]
+        if impossible_transitions is not None:
+            values.append(impossible_transitions.ravel().astype(loss.dtype))
+        values = self.model.ops.to_numpy(xp.concatenate(values)).tolist()
+        if len(values) > 1 and values[1]:
+            logger.warning(
+                "You likely have an impossible transition in your "
+                "training data NER tags, skipping this batch."
+            )
+        return float(values[0]), xp.ones_like(loss)
 
     def initialize(
         self,
@@ -360,20 +408,16 @@ class TrainableNer(TrainablePipe):
         sub_batch = list(islice(get_examples(), NUM_INITIALIZATION_EXAMPLES))
         if self.ent_labels is None or self.spans_labels is None:
             ent_labels_before = self.ent_labels
-            if self.ent_labels is None:
-                self.cfg["ent_labels"] = tuple(
-                    sorted(
-                        {
-                            span.label_
-                            for doc in sub_batch
-                            for span in doc.reference.ents
-                        }
-                    )
-                )
-
-            if self.spans_labels is None:
-                spans_labels = defaultdict(lambda: set())
-                for doc in sub_batch:
+            infer_ent_labels = self.ent_labels is None
+            infer_spans_labels = self.spans_labels is None
+
+            # Collect the labels of `doc.ents` and `doc.spans` in a single pass
+            ent_labels = set()
+            spans_labels = defaultdict(lambda: set())
+            for doc in sub_batch:
+                if infer_ent_labels:
+                    ent_labels.update(span.label_ for span in doc.reference.ents)
+                if infer_spans_labels:
                     for name, group in doc.reference.spans.items():
                         for span in group:
                             if (
@@ -382,6 +426,10 @@ class TrainableNer(TrainablePipe):
                             ):
                                 spans_labels[name].add(span.label_)
 
+            if infer_ent_labels:
+                self.cfg["ent_labels"] = tuple(sorted(ent_labels))
+
+            if infer_spans_labels:
                 self.cfg["spans_labels"] = {
                     name: tuple(sorted(group)) for name, group in spans_labels.items()
                 }
@@ -424,7 +472,7 @@ class TrainableNer(TrainablePipe):
         -------
         Ints2d
         """
-        label_vocab = {self.vocab.strings[l]: i for i, l in enumerate(self.labels)}
+        label_vocab = self.label_vocab
         spans = set()
         for eg_idx, eg in enumerate(examples):
             for span in (
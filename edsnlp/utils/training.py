@@ -158,7 +158,7 @@ def make_spacy_corpus_config(
         else:
             raise Exception()
     if data_format == DataFormat.brat:
-        train_docs = list(BratConnector(train_data).brat2docs(nlp))
+        train_docs = BratConnector(train_data).brat2docs(nlp)
     elif data_format == DataFormat.spacy:
         if isinstance(dev_data, (float, int)):
             train_docs = DocBin().from_disk(train_data)
@@ -174,7 +174,7 @@ def make_spacy_corpus_config(
         dev_docs = train_docs[:n_dev]
         train_docs = train_docs[n_dev:]
     elif data_format == DataFormat.brat:
-        dev_docs = list(BratConnector(dev_data).brat2docs(nlp))
+        dev_docs = BratConnector(dev_data).brat2docs(nlp)
     elif data_format == DataFormat.spacy:
         pass
     elif data_format is None:
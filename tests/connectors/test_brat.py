@@ -1,4 +1,5 @@
 import filecmp
+import os
 import re
 from os import listdir
 from os.path import join
@@ -6,6 +7,7 @@ from pathlib import Path
 from random import choice, randint, random
 from string import ascii_letters, ascii_lowercase
 
+import pandas as pd
 import pytest
 from spacy.language import Language
 
@@ -85,6 +87,42 @@ def test_brat2pandas(brat1: BratConnector):
     brat1.get_brat()
 
 
+def test_brat2pandas_cache(
+    brat1: BratConnector,
+    brat_importer: BratConnector,
+    tmp_path_factory,
+    monkeypatch,
+):
+    pytest.importorskip("pyarrow")
+    cache_path = tmp_path_factory.mktemp("cache")
+
+    texts, annotations = brat1.get_brat(cache_path=cache_path)
+
+    def load_brat():
+        raise AssertionError("The BRAT files should not be parsed again")
+
+    # The cached DataFrames are read back without parsing the BRAT files
+    with monkeypatch.context() as m:
+        m.setattr(brat1, "load_brat", load_brat)
+        cached_texts, cached_annotations = brat1.get_brat(cache_path=cache_path)
+    pd.testing.assert_frame_equal(texts, cached_texts)
+    pd.testing.assert_frame_equal(annotations, cached_annotations)
+
+    # Modifying an annotation file invalidates the cache
+    ann_path = join(brat1.directory, "1.ann")
+    mtime = os.path.getmtime(ann_path)
+    with open(ann_path, "a") as f:
+        f.write("T1000\tNEW 0 1\tx\n")
+    os.utime(ann_path, (mtime + 10, mtime + 10))
+    _, new_annotations = brat1.get_brat(cache_path=cache_path)
+    assert len(new_annotations) == len(annotations) + 1
+    assert "NEW" in set(new_annotations.label)
+
+    # The cache of another directory is not reused
+    other_texts, _ = brat_importer.get_brat(cache_path=cache_path)
+    assert list(other_texts.note_id) == ["subfolder/doc-1"]
+
+
 def test_brat2brat(brat1: BratConnector, brat2: BratConnector, blank_nlp: Language):
     docs = brat1.brat2docs(blank_nlp)
     brat2.docs2brat(docs)
@@ -1,4 +1,9 @@
+import copy
+import pickle
+
+import pytest
 import spacy
+import torch
 from pytest import fixture, mark
 from spacy.tokens import Span
 from spacy.training import Example
@@ -60,3 +65,61 @@ def test_nested_ner_training(blank_nlp, gold, tmp_path, crf_mode):
     assert len(pred.spans["criteria"]) == 1
 
     spacy.load(tmp_path / "model-last")
+
+
+def make_nested_ner_nlp(**model_config):
+    nlp = spacy.blank("eds")
+    nlp.add_pipe(
+        "nested_ner",
+        config={
+            **NESTED_NER_DEFAULTS,
+            "model": {
+                **NESTED_NER_DEFAULTS["model"],
+                **model_config,
+            },
+        },
+    )
+    return nlp
+
+
+def update_and_predict(nlp, gold):
+    examples = [Example(nlp.make_doc(gold.text), gold)]
+    nlp.initialize(lambda: examples)
+
+    losses = nlp.update(examples)
+    assert losses["nested_ner"] >= 0
+
+    pred = nlp(gold.text)
+    assert set(pred.spans) == {"event", "criteria"}
+
+
+@mark.skipif(not torch.cuda.is_available(), reason="Mixed precision requires a GPU")
+def test_nested_ner_mixed_precision(gold):
+    pytest.importorskip("cupy")
+    spacy.require_gpu()
+    try:
+        nlp = make_nested_ner_nlp(mixed_precision=True)
+        update_and_predict(nlp, gold)
+    finally:
+        spacy.require_cpu()
+
+
+def test_nested_ner_mixed_precision_on_cpu(gold):
+    nlp = make_nested_ner_nlp(mixed_precision=True)
+    with pytest.raises(ValueError):
+        nlp.initialize(lambda: [Example(nlp.make_doc(gold.text), gold)])
+
+
+@mark.skipif(not hasattr(torch, "compile"), reason="torch.compile requires torch>=2.0")
+def test_nested_ner_torch_compile(gold):
+    nlp = make_nested_ner_nlp(torch_compile=True)
+    update_and_predict(nlp, gold)
+
+    pt_model = nlp.get_pipe("nested_ner").model.attrs["pt_model"]
+    assert pt_model._compiled_call is not None
+
+    # The compiled function is bound to its module, and is not carried over
+    pt_model_copy = copy.deepcopy(pt_model)
+    assert pt_model_copy.torch_compile
+    assert pt_model_copy._compiled_call is None
+    pickle.dumps(pt_model)